@@ -0,0 +1,104 @@
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# --- Deadline-Aware Admission Control ---
+#
+# The model path is CPU-bound, so concurrent model requests effectively queue behind
+# each other. A request's expected latency is roughly (in-flight + 1) x recent model
+# service time (measured inside the worker, so queueing is not counted twice). When that would blow the caller's budget (or the in-flight cap) we answer
+# from the cheap heuristic path instead of letting the queue grow.
+
+
+class AdmissionController:
+    """
+    Tracks in-flight model-path work and recent model service times.
+    Samples older than max_age seconds are ignored; with none left, an idle server lets one
+    request through to the model as a probe, so a stale estimate can always recover.
+    """
+
+    def __init__(self, max_in_flight=8, window=100, initial_latency=0.25, percentile=0.9, max_age=30.0):
+        self.max_in_flight = max_in_flight
+        self.initial_latency = initial_latency
+        self.percentile = percentile
+        self.max_age = max_age
+        self.latencies = deque(maxlen=window)  # (recorded at, seconds)
+        self.in_flight = 0
+
+    def _fresh(self):
+        cutoff = time.monotonic() - self.max_age
+        return [seconds for recorded, seconds in self.latencies if recorded >= cutoff]
+
+    def recent_latency(self):
+        """
+        High percentile of recent model service times in seconds (initial guess until we have data).
+        """
+        fresh = self._fresh()
+        if not fresh:
+            return self.initial_latency
+        ordered = sorted(fresh)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * self.percentile))]
+
+    def estimate(self):
+        """
+        Expected seconds until a new model-path request would finish.
+        """
+        return (self.in_flight + 1) * self.recent_latency()
+
+    def retry_after(self):
+        """
+        Seconds until the current model queue should have drained (for Retry-After).
+        """
+        return max(1, math.ceil(self.in_flight * self.recent_latency()))
+
+    def decide(self, budget=None, can_degrade=True):
+        """
+        "model", "degrade" or "reject" for a request with `budget` seconds left (None = no budget).
+        """
+        if budget is not None and budget <= 0:
+            return "reject"
+        if self.in_flight == 0 and not self._fresh():
+            # Probe: nothing recent to estimate from
+            return "model"
+        fits = self.in_flight < self.max_in_flight and (budget is None or self.estimate() <= budget)
+        if fits:
+            return "model"
+        return "degrade" if can_degrade else "reject"
+
+    def record(self, seconds):
+        self.latencies.append((time.monotonic(), seconds))
+
+    def timed(self, fn, *args):
+        """
+        Call fn(*args) and record its service time. Run this inside the worker thread,
+        so time spent waiting for the threadpool / GIL is not part of the sample.
+        """
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.record(time.perf_counter() - start)
+
+    @contextmanager
+    def track(self):
+        """
+        Wrap model-path work so it counts as in flight.
+        """
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+
+
+def request_budget(latency_budget_ms=None, deadline=None, now=None):
+    """
+    Seconds left for a request given an optional budget (ms) and/or absolute deadline (unix seconds).
+    """
+    budgets = []
+    if latency_budget_ms is not None:
+        budgets.append(latency_budget_ms / 1000)
+    if deadline is not None:
+        budgets.append(deadline - (time.time() if now is None else now))
+    return min(budgets) if budgets else None
@@ -0,0 +1,68 @@
+import random
+import time
+
+from features import TextAnalyzer
+from live import LiveDocument
+from online_model import HashingModel
+
+# Random edits against LiveDocument, checked against a full recompute after every step
+
+ALPHABET = list("abe .!?\n  12") + [
+    "shocking ", "crime", "panic", "10 ways", "http://x.y", "a@b", "best", "hate", "\xa0", "...", "?!",
+    "reuters ", "said ", "the ", "plan ",
+]
+
+def random_text(n):
+    return "".join(random.choice(ALPHABET) for _ in range(n))
+
+def random_model():
+    model = HashingModel()
+    texts = [random_text(200) for _ in range(300)]
+    return model.partial_fit(texts, [random.randint(0, 1) for _ in texts])
+
+def check_equivalence(trials=100, steps=50):
+    model = random_model()
+    for trial in range(trials):
+        document = LiveDocument(random_text(random.randint(0, 2000)))
+        expected = document.text
+        for step in range(steps):
+            start = random.randint(0, len(expected))
+            end = random.randint(start, min(len(expected), start + random.choice([0, 1, 3, 600])))
+            text = random_text(random.choice([0, 1, 2, 10, 300]))
+
+            document.replace(start, end, text)
+            expected = expected[:start] + text + expected[end:]
+
+            assert document.text == expected
+            assert document.analysis() == TextAnalyzer.analyze(expected), repr(expected)
+            if step % 10 == 0:
+                # Also after the model changed, so the cached weighted sum is recomputed
+                model.partial_fit([random_text(100)], [random.randint(0, 1)])
+            expected_proba = model.predict_proba([expected])[0][1]
+            assert abs(document.model_proba(model) - expected_proba) < 1e-9, repr(expected)
+    print(f"Equivalence OK ({trials} documents x {steps} edits)")
+
+def check_speed(words=50000, edits=1000):
+    model = random_model()
+    vocabulary = "the government announced a shocking new crisis plan. Experts believe it is great!".split()
+    document = LiveDocument(" ".join(random.choice(vocabulary) for _ in range(words)))
+
+    start = time.perf_counter()
+    for _ in range(edits):
+        pos = random.randint(0, document.length)
+        document.replace(pos, pos, "x")
+        document.analysis()
+        document.model_proba(model)
+    live_ms = (time.perf_counter() - start) / edits * 1000
+
+    start = time.perf_counter()
+    TextAnalyzer.analyze(document.text)
+    model.predict_proba([document.text])
+    full_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{document.length} chars: incremental {live_ms:.3f} ms/edit, full recompute {full_ms:.1f} ms")
+
+if __name__ == "__main__":
+    random.seed(42)
+    check_equivalence()
+    check_speed()
@@ -0,0 +1,49 @@
+import sys
+import time
+
+from fastapi.testclient import TestClient
+
+from main import app
+
+# Bytes-on-the-wire and latency for /predict under the different payload options.
+# Usage: python debug_payload.py [article url, to also measure /scan-url]
+
+ARTICLE = (
+    "Shocking report: officials deny the crisis as panic spreads. Experts believe the plan is a "
+    "disaster and a betrayal, while others think it is the best solution in years. "
+) * 40
+
+RUNS = 200
+
+def measure(client, name, method="post", params=None, headers=None, path="/predict", runs=RUNS):
+    params = dict(params or {})
+    headers = dict(headers or {})
+    total_bytes = 0
+    start = time.perf_counter()
+    for _ in range(runs):
+        if method == "post":
+            r = client.post(path, params=params, json={"text": ARTICLE}, headers=headers)
+        else:
+            r = client.get(path, params=params or {"text": ARTICLE}, headers=headers)
+        total_bytes += r.num_bytes_downloaded
+    elapsed = (time.perf_counter() - start) / runs * 1000
+    print(f"{name:<28} status {r.status_code}  {total_bytes // runs:>6} bytes  {elapsed:6.2f} ms")
+    return r
+
+if __name__ == "__main__":
+    client = TestClient(app)
+    print(f"Article: {len(ARTICLE)} chars, {RUNS} runs each")
+    measure(client, "uncompressed", headers={"Accept-Encoding": "identity"})
+    measure(client, "gzip", headers={"Accept-Encoding": "gzip"})
+    measure(client, "brotli", headers={"Accept-Encoding": "br"})
+    measure(client, "fields=sentiment,tone", params={"fields": "sentiment,tone"}, headers={"Accept-Encoding": "identity"})
+
+    first = measure(client, "GET (cold)", method="get", headers={"Accept-Encoding": "gzip"})
+    measure(client, "GET If-None-Match (304)", method="get", headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["etag"]})
+
+    if len(sys.argv) > 1:
+        scan = {"url": sys.argv[1]}
+        measure(client, "scan-url uncompressed", "get", scan, {"Accept-Encoding": "identity"}, "/scan-url", 5)
+        measure(client, "scan-url gzip", "get", scan, {"Accept-Encoding": "gzip"}, "/scan-url", 5)
+        first = measure(client, "scan-url brotli", "get", scan, {"Accept-Encoding": "br"}, "/scan-url", 5)
+        measure(client, "scan-url If-None-Match (304)", "get", scan, {"Accept-Encoding": "br", "If-None-Match": first.headers["etag"]}, "/scan-url", 5)
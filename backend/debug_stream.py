@@ -0,0 +1,78 @@
+import asyncio
+import json
+import random
+import resource
+import sys
+import time
+
+from main import app
+
+# Push a synthetic NDJSON dump through /predict/stream in-process and check that
+# results arrive while uploading and that memory stays flat regardless of size.
+# Usage: python debug_stream.py [megabytes]
+
+UPLOAD_CHUNK = 64 * 1024
+
+WORDS = "the government announced a shocking new crisis plan experts believe it is great report says".split()
+
+def synthetic_body(megabytes):
+    random.seed(0)
+    limit = megabytes * 1024 * 1024
+    sent = 0
+    buffer = bytearray()
+    number = 0
+    while sent < limit:
+        number += 1
+        text = " ".join(random.choice(WORDS) for _ in range(random.randint(50, 600))) + "."
+        buffer += json.dumps({"id": number, "text": text}).encode() + b"\n"
+        if len(buffer) >= UPLOAD_CHUNK:
+            sent += len(buffer)
+            yield bytes(buffer), number
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer), number
+
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+async def run(megabytes):
+    body = synthetic_body(megabytes)
+    stats = {"uploaded": 0, "records": 0, "results": 0, "first_result_at": None, "bytes_out": 0}
+
+    async def receive():
+        chunk = next(body, None)
+        if chunk is None:
+            return {"type": "http.request", "body": b"", "more_body": False}
+        data, stats["records"] = chunk
+        stats["uploaded"] += len(data)
+        return {"type": "http.request", "body": data, "more_body": True}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            data = message.get("body", b"")
+            stats["bytes_out"] += len(data)
+            stats["results"] += data.count(b"\n")
+            if data and stats["first_result_at"] is None:
+                stats["first_result_at"] = stats["uploaded"]
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": "2.4"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": "/predict/stream", "raw_path": b"/predict/stream",
+        "query_string": b"", "root_path": "", "server": ("test", 80), "client": ("test", 1),
+        "headers": [(b"content-type", b"application/x-ndjson")],
+    }
+
+    rss_before = max_rss_mb()
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    elapsed = time.perf_counter() - start
+
+    print(f"Uploaded {stats['uploaded'] / 1e6:.1f} MB ({stats['records']} records) in {elapsed:.1f}s "
+          f"= {stats['uploaded'] / 1e6 / elapsed:.1f} MB/s")
+    print(f"Results: {stats['results']} lines, {stats['bytes_out'] / 1e6:.1f} MB out")
+    print(f"First result after {stats['first_result_at'] / 1e6:.2f} MB uploaded")
+    print(f"Peak RSS: {rss_before:.0f} MB before, {max_rss_mb():.0f} MB after")
+    assert stats["results"] == stats["records"], "every record must get exactly one result line"
+
+if __name__ == "__main__":
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else 300))
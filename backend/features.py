@@ -31,6 +31,20 @@ SUBJECTIVE_WORDS = {
     'shocking', 'absolutely', 'definitely', 'worst', 'best', 'beautiful', 'ugly'
 }
 
+# Tone Lexicons (matched as substrings of the lowercased text)
+ANGRY_WORDS = {'outrage', 'furious', 'betrayal', 'disgusting', 'shame', 'illegal', 'crime'}
+FEAR_WORDS = {'panic', 'crisis', 'collapse', 'danger', 'threat', 'deadly', 'catastrophe'}
+
+# Words that give the label away in Fake.csv/True.csv rather than say anything about the story:
+# Reuters style ("reuters", "said", datelines with weekdays and months) marks REAL, "mr", "via",
+# "image" and "best" mark FAKE. Excluded from model features by train_model_basic.py and online_model.py.
+LABEL_LEAK_WORDS = {
+    'reuters', 'said', 'reporting', 'via', 'image', 'mr', 'washington',
+    'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday',
+    'january', 'february', 'march', 'april', 'may', 'june', 'july', 'august', 'september', 'october', 'november', 'december',
+    'best', 'pm', 'am', 'night'
+}
+
 def clean_text(text):
     """
     Standard cleaning for text analysis.
@@ -43,6 +57,30 @@ def clean_text(text):
     text = re.sub(r'\s+', ' ', text).strip()
     return text
 
+def count_syllables(word):
+    """
+    Heuristic syllable counting.
+    """
+    word = word.lower()
+    count = 0
+    vowels = "aeiouy"
+    if word and word[0] in vowels: count += 1
+    for i in range(1, len(word)):
+        if word[i] in vowels and word[i - 1] not in vowels:
+            count += 1
+    if word.endswith("e"): count -= 1
+    return max(1, count)
+
+def reading_ease_from_counts(word_count, sentence_count, syllable_count):
+    """
+    Flesch Reading Ease from pre-computed counts.
+    """
+    if word_count == 0: return 50.0
+    if sentence_count == 0: sentence_count = 1
+
+    score = 206.835 - 1.015 * (word_count / sentence_count) - 84.6 * (syllable_count / word_count)
+    return score
+
 def estimate_reading_ease(text):
     """
     Estimate Flesch Reading Ease (Pure Python).
@@ -55,24 +93,10 @@ def estimate_reading_ease(text):
 
     sentences = re.split(r'[.!?]+', text)
     sentence_count = len([s for s in sentences if s.strip()])
-    if sentence_count == 0: sentence_count = 1
-
-    # Heuristic syllable counting
-    def count_syllables(word):
-        word = word.lower()
-        count = 0
-        vowels = "aeiouy"
-        if word and word[0] in vowels: count += 1
-        for i in range(1, len(word)):
-            if word[i] in vowels and word[i - 1] not in vowels:
-                count += 1
-        if word.endswith("e"): count -= 1
-        return max(1, count)
 
     syllable_count = sum(count_syllables(w) for w in words)
     
-    score = 206.835 - 1.015 * (word_count / sentence_count) - 84.6 * (syllable_count / word_count)
-    return score
+    return reading_ease_from_counts(word_count, sentence_count, syllable_count)
 
 class TextAnalyzer:
     """
@@ -85,19 +109,44 @@ class TextAnalyzer:
         if not text: return {}
         
         words = clean_text(text).split()
-        total_words = len(words)
+        raw_words = text.split()
+        lower_text = text.lower()
+        sentences = re.split(r'[.!?]+', text)
+
+        return TextAnalyzer.summarize({
+            "word_count": len(raw_words),
+            "sentence_count": len([s for s in sentences if s.strip()]),
+            "syllable_count": sum(count_syllables(w) for w in raw_words),
+            "total_words": len(words),
+            "pos_count": sum(1 for w in words if w in POSITIVE_WORDS),
+            "neg_count": sum(1 for w in words if w in NEGATIVE_WORDS),
+            "subj_count": sum(1 for w in words if w in SUBJECTIVE_WORDS),
+            "angry_hits": {w for w in ANGRY_WORDS if w in lower_text},
+            "fear_hits": {w for w in FEAR_WORDS if w in lower_text},
+            "double_punct": '?!' in text or '!!' in text,
+            "bait_word": bool(re.search(r'\b(shocking|secret|banned|exposed|miracle)\b', lower_text)),
+            "list_head": bool(re.search(r'^\d+\s+(signs|ways|things)', lower_text)),
+        })
+
+    @staticmethod
+    def summarize(counts):
+        """
+        Turn raw document counts into the analysis dict.
+        Split from analyze() so incremental callers (see live.py) share the labelling logic.
+        """
+        total_words = counts["total_words"]
         if total_words == 0: total_words = 1
         
         # 1. Reading Level
-        score = estimate_reading_ease(text)
+        score = reading_ease_from_counts(counts["word_count"], counts["sentence_count"], counts["syllable_count"])
         if score > 80: level = "Very Easy"
         elif score > 60: level = "Standard"
         elif score > 30: level = "Complex"
         else: level = "Very Complex (Academic/Legal)"
             
         # 2. Sentiment (Dictionary Match)
-        pos_count = sum(1 for w in words if w in POSITIVE_WORDS)
-        neg_count = sum(1 for w in words if w in NEGATIVE_WORDS)
+        pos_count = counts["pos_count"]
+        neg_count = counts["neg_count"]
         
         sentiment_score = (pos_count - neg_count) / max(1, pos_count + neg_count) * 1.0 # -1 to 1
         
@@ -106,38 +155,32 @@ class TextAnalyzer:
         else: sentiment_label = "Neutral"
         
         # 3. Objectivity (Dictionary Match)
-        subj_count = sum(1 for w in words if w in SUBJECTIVE_WORDS)
-        subj_ratio = subj_count / total_words
+        subj_ratio = counts["subj_count"] / total_words
         
         objectivity_label = "Highly Subjective/Opinionated" if subj_ratio > 0.05 else "Mostly Objective/Factual"
         
         # 4. Tone Detection (Heuristic)
         tone = "Neutral"
-        lower_text = text.lower()
-        
-        angry_words = {'outrage', 'furious', 'betrayal', 'disgusting', 'shame', 'illegal', 'crime'}
-        fear_words = {'panic', 'crisis', 'collapse', 'danger', 'threat', 'deadly', 'catastrophe'}
-
-        angry_score = sum(1 for w in angry_words if w in lower_text)
-        fear_score = sum(1 for w in fear_words if w in lower_text)
+        angry_hits = counts["angry_hits"]
+        fear_hits = counts["fear_hits"]
         
-        if angry_score > 0: tone = "Aggressive / Angry"
-        elif fear_score > 0: tone = "Alarmist / Fearful"
+        if angry_hits: tone = "Aggressive / Angry"
+        elif fear_hits: tone = "Alarmist / Fearful"
         elif subj_ratio > 0.1: tone = "Highly Emotional"
         
         # 5. Clickbait Score
         clickbait_score = 0
-        if '?!' in text or '!!' in text: clickbait_score += 20
-        if re.search(r'\b(shocking|secret|banned|exposed|miracle)\b', lower_text): clickbait_score += 30
-        if re.search(r'^\d+\s+(signs|ways|things)', lower_text): clickbait_score += 20
+        if counts["double_punct"]: clickbait_score += 20
+        if counts["bait_word"]: clickbait_score += 30
+        if counts["list_head"]: clickbait_score += 20
         clickbait_score = min(100, clickbait_score)
         
-        # 6. Keywords
+        # 6. Keywords (sorted: set order changes with PYTHONHASHSEED, and responses must be stable)
         flagged_keywords = []
-        for w in angry_words:
-            if w in lower_text: flagged_keywords.append({"word": w, "category": "Aggressive"})
-        for w in fear_words:
-            if w in lower_text: flagged_keywords.append({"word": w, "category": "Fearmongering"})
+        for w in sorted(ANGRY_WORDS):
+            if w in angry_hits: flagged_keywords.append({"word": w, "category": "Aggressive"})
+        for w in sorted(FEAR_WORDS):
+            if w in fear_hits: flagged_keywords.append({"word": w, "category": "Fearmongering"})
 
         return {
             "reading_level": level,
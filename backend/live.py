@@ -0,0 +1,314 @@
+import math
+import re
+from bisect import bisect_right
+from collections import Counter
+
+from features import (
+    ANGRY_WORDS, FEAR_WORDS, POSITIVE_WORDS, NEGATIVE_WORDS, SUBJECTIVE_WORDS, LABEL_LEAK_WORDS,
+    TextAnalyzer, clean_text, count_syllables,
+)
+from online_model import N_FEATURES, hash_token, sigmoid, term_weight
+
+# --- Incremental Analysis for the Live Editor ---
+#
+# The document is kept as a list of blocks. Every block except the last one ends
+# right after a whitespace character, so no token ever spans two blocks. All the
+# counts TextAnalyzer needs are per-token, which means an edit only has to
+# re-count the blocks it touches. The same goes for the online model's hashed unigram
+# counts (see online_model.py). The only cross-block facts are:
+#   - sentence boundaries (a sentence can run across a block boundary)
+#   - the model's bigram of the last word of one block and the first word of the next
+#   - the "10 ways ..." clickbait check, anchored at the start of the document
+
+BLOCK_SIZE = 512
+
+SENTENCE_END = '.!?'
+WHITESPACE = re.compile(r'\s')
+
+COUNT_KEYS = (
+    "word_count", "sentence_count", "syllable_count", "total_words",
+    "pos_count", "neg_count", "subj_count",
+    "double_punct", "bait_word",
+)
+
+
+class _Block:
+    __slots__ = (
+        "text", "counts", "angry_hits", "fear_hits", "lead", "tail", "joined",
+        "hashed", "first_word", "last_word", "bridge",
+    )
+
+    def __init__(self, text):
+        self.text = text
+
+        raw_words = text.split()
+        words = clean_text(text).split()
+        lower_text = text.lower()
+        sentences = re.split(r'[.!?]+', text)
+
+        self.counts = {
+            "word_count": len(raw_words),
+            # Counted as if the block started the document, see LiveDocument._relink
+            "sentence_count": len([s for s in sentences if s.strip()]),
+            "syllable_count": sum(count_syllables(w) for w in raw_words),
+            "total_words": len(words),
+            "pos_count": sum(1 for w in words if w in POSITIVE_WORDS),
+            "neg_count": sum(1 for w in words if w in NEGATIVE_WORDS),
+            "subj_count": sum(1 for w in words if w in SUBJECTIVE_WORDS),
+            "double_punct": int('?!' in text or '!!' in text),
+            "bait_word": int(bool(re.search(r'\b(shocking|secret|banned|exposed|miracle)\b', lower_text))),
+        }
+        self.angry_hits = [w for w in ANGRY_WORDS if w in lower_text]
+        self.fear_hits = [w for w in FEAR_WORDS if w in lower_text]
+
+        # Class of the first / last non-whitespace character: 'T' (terminator), 'C' (content) or None
+        stripped = text.strip()
+        self.lead = ('T' if stripped[0] in SENTENCE_END else 'C') if stripped else None
+        self.tail = ('T' if stripped[-1] in SENTENCE_END else 'C') if stripped else None
+        self.joined = False
+
+        # Online model features: hashed unigrams + bigrams within the block, {column: signed count}
+        model_words = [w for w in words if w not in LABEL_LEAK_WORDS]
+        self.hashed = {}
+        for token in model_words + [a + " " + b for a, b in zip(model_words, model_words[1:])]:
+            column, sign = hash_token(token)
+            self.hashed[column] = self.hashed.get(column, 0.0) + sign
+        self.first_word = model_words[0] if model_words else None
+        self.last_word = model_words[-1] if model_words else None
+        self.bridge = None  # (column, sign) of the bigram with the previous block's last word, see LiveDocument._rebridge
+
+
+def _add(counter, items, sign):
+    # In-place Counter update that drops keys reaching zero
+    for key, n in items:
+        value = counter[key] + sign * n
+        if value:
+            counter[key] = value
+        else:
+            del counter[key]
+
+
+def split_blocks(text):
+    """
+    Split text into blocks of roughly BLOCK_SIZE characters, cutting only right after whitespace.
+    """
+    blocks = []
+    pos = 0
+    while pos < len(text):
+        end = pos + BLOCK_SIZE
+        if end >= len(text):
+            end = len(text)
+        else:
+            cut = end - 1
+            while cut >= pos and not text[cut].isspace():
+                cut -= 1
+            if cut >= pos:
+                end = cut + 1
+            else:
+                # A single token longer than BLOCK_SIZE; cut after the next whitespace
+                match = WHITESPACE.search(text, end)
+                end = match.end() if match else len(text)
+        blocks.append(_Block(text[pos:end]))
+        pos = end
+    return blocks
+
+
+class LiveDocument:
+    """
+    Per-session document state for live analysis.
+    Re-analysis after an edit is proportional to the edited blocks, not to the whole document;
+    the only remaining linear term is shifting the integer start offsets of the blocks after
+    the edit. analysis() always matches TextAnalyzer.analyze(document.text).
+    """
+
+    def __init__(self, text=""):
+        self.reset(text)
+
+    def reset(self, text):
+        self.blocks = []
+        self.starts = []  # start offset of each block, for bisect lookups
+        self.length = 0
+        self.counts = dict.fromkeys(COUNT_KEYS, 0)
+        self.angry_hits = Counter()
+        self.fear_hits = Counter()
+        self.joins = 0
+        # Online model: document-wide hashed counts, sum of squared term weights (for the L2 norm)
+        # and the weighted sum for the model it was last computed against
+        self.hashed = {}
+        self.norm_sq = 0.0
+        self.dot = 0.0
+        self.dot_model = None
+        if text:
+            self.replace(0, 0, text)
+
+    @property
+    def text(self):
+        return "".join(block.text for block in self.blocks)
+
+    def _find(self, pos):
+        """
+        Index and start offset of the block containing pos (the last block if pos == length).
+        """
+        if not self.blocks:
+            return 0, 0
+        index = bisect_right(self.starts, pos) - 1
+        return index, self.starts[index]
+
+    def _account(self, blocks, sign):
+        for block in blocks:
+            for key in COUNT_KEYS:
+                self.counts[key] += sign * block.counts[key]
+            _add(self.angry_hits, ((w, 1) for w in block.angry_hits), sign)
+            _add(self.fear_hits, ((w, 1) for w in block.fear_hits), sign)
+            self.joins += sign * block.joined
+            for column, n in block.hashed.items():
+                self._bump(column, sign * n)
+            if block.bridge:
+                self._bump(block.bridge[0], sign * block.bridge[1])
+
+    def _bump(self, column, n):
+        old = self.hashed.get(column, 0.0)
+        new = old + n
+        if new:
+            self.hashed[column] = new
+        else:
+            self.hashed.pop(column, None)
+        old_weight, new_weight = term_weight(old), term_weight(new)
+        self.norm_sq += new_weight * new_weight - old_weight * old_weight
+        if self.dot_model is not None:
+            self.dot += self.dot_model[0].weights[column] * (new_weight - old_weight)
+
+    def _relink(self, first, last):
+        """
+        Recompute sentence joins for blocks[first:last] and the next non-empty block after them.
+        A block "joins" when it starts with content and the previous non-empty block ends with
+        content: the sentence runs across the boundary and must only be counted once.
+        """
+        prev_tail = None
+        for index in range(first - 1, -1, -1):
+            if self.blocks[index].tail:
+                prev_tail = self.blocks[index].tail
+                break
+
+        index = first
+        while index < len(self.blocks):
+            block = self.blocks[index]
+            joined = block.lead == 'C' and prev_tail == 'C'
+            self.joins += joined - block.joined
+            block.joined = joined
+            if block.tail:
+                prev_tail = block.tail
+                if index >= last:
+                    break
+            index += 1
+
+    def _rebridge(self, first, last):
+        """
+        Recompute the cross-block bigrams for blocks[first:last] and the next block with words after
+        them, the same way _relink does for sentence joins.
+        """
+        prev_word = None
+        for index in range(first - 1, -1, -1):
+            if self.blocks[index].last_word:
+                prev_word = self.blocks[index].last_word
+                break
+
+        index = first
+        while index < len(self.blocks):
+            block = self.blocks[index]
+            bridge = hash_token(prev_word + " " + block.first_word) if prev_word and block.first_word else None
+            if bridge != block.bridge:
+                if block.bridge:
+                    self._bump(block.bridge[0], -block.bridge[1])
+                if bridge:
+                    self._bump(bridge[0], bridge[1])
+                block.bridge = bridge
+            if block.last_word:
+                prev_word = block.last_word
+                if index >= last:
+                    break
+            index += 1
+
+    def replace(self, start, end, text):
+        """
+        Replace document[start:end] with text.
+        """
+        if not (0 <= start <= end <= self.length):
+            raise ValueError(f"Edit range {start}:{end} is outside the document (length {self.length})")
+
+        first, offset = self._find(start)
+        last, _ = self._find(end)
+        last += 1
+
+        old_blocks = self.blocks[first:last]
+        region = "".join(block.text for block in old_blocks)
+        region = region[:start - offset] + text + region[end - offset:]
+
+        # Absorb the next block when the region shrinks, so deletions don't fragment the document
+        while len(region) < BLOCK_SIZE // 2 and last < len(self.blocks):
+            old_blocks.append(self.blocks[last])
+            region += self.blocks[last].text
+            last += 1
+
+        new_blocks = split_blocks(region)
+        self._account(old_blocks, -1)
+        self.blocks[first:last] = new_blocks
+        self._account(new_blocks, 1)
+
+        delta = len(text) - (end - start)
+        new_starts = []
+        for block in new_blocks:
+            new_starts.append(offset)
+            offset += len(block.text)
+        after = first + len(new_blocks)
+        self.starts[first:last] = new_starts
+        self.starts[after:] = [start_offset + delta for start_offset in self.starts[after:]]
+        self.length += delta
+        self._relink(first, first + len(new_blocks))
+        self._rebridge(first, first + len(new_blocks))
+
+    def apply(self, edits):
+        """
+        Apply a sequence of {"start", "end", "text"} edits in order.
+        """
+        for edit in edits:
+            self.replace(int(edit["start"]), int(edit["end"]), edit.get("text", ""))
+
+    def _list_head(self):
+        # '^\d+\s+(signs|ways|things)' only looks at the first two tokens
+        head = []
+        words = 0
+        for block in self.blocks:
+            head.append(block.text)
+            words += block.counts["word_count"]
+            if words >= 2:
+                break
+        return bool(re.search(r'^\d+\s+(signs|ways|things)', "".join(head).lower()))
+
+    def analysis(self):
+        if not self.length: return {}
+
+        counts = dict(self.counts)
+        counts["sentence_count"] -= self.joins
+        counts["double_punct"] = counts["double_punct"] > 0
+        counts["bait_word"] = counts["bait_word"] > 0
+        counts["angry_hits"] = set(self.angry_hits)
+        counts["fear_hits"] = set(self.fear_hits)
+        counts["list_head"] = self._list_head()
+        return TextAnalyzer.summarize(counts)
+
+    def model_proba(self, model):
+        """
+        P(FAKE) from a HashingModel, equal to model.predict_proba([document.text])[0][1] but scored
+        from the cached hashed counts. The weighted sum is kept up to date per edit and only
+        recomputed in full when the model has been updated since it was last scored against.
+        Returns None if the model hashes into a different feature space.
+        """
+        if model.n_features != N_FEATURES:
+            return None
+        if self.dot_model != (model, model.updates):
+            weights = model.weights
+            self.dot_model = (model, model.updates)
+            self.dot = sum(weights[column] * term_weight(n) for column, n in self.hashed.items())
+        norm = math.sqrt(self.norm_sq) if self.hashed else 1.0
+        return sigmoid(model.bias + self.dot / norm)
@@ -1,5 +1,12 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi import FastAPI, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.requests import ClientDisconnect
+from pydantic import BaseModel, Field
+from typing import Optional
+import asyncio
+import hmac
+import json
 import os
 from dotenv import load_dotenv
 
@@ -31,6 +38,36 @@ try:
         startup_error = f"Features Import Error: {e} | {traceback.format_exc()}"
         TextAnalyzer = None
 
+    try:
+        from live import LiveDocument
+    except ImportError as e:
+        print(f"Live Analysis Import Warning: {e}")
+        LiveDocument = None
+
+    try:
+        from admission import AdmissionController, request_budget
+    except ImportError as e:
+        print(f"Admission Control Import Warning: {e}")
+        AdmissionController = None
+
+    try:
+        from streaming import iter_records
+    except ImportError as e:
+        print(f"Streaming Import Warning: {e}")
+        iter_records = None
+
+    try:
+        from payload import input_etag, json_response, not_modified, trim_analysis
+    except ImportError as e:
+        print(f"Payload Import Warning: {e}")
+        json_response = None
+
+    try:
+        from online_model import HashingModel
+    except ImportError as e:
+        print(f"Online Model Import Warning: {e}")
+        HashingModel = None
+
     try:
         from supabase import create_client, Client
     except ImportError as e:
@@ -65,22 +102,209 @@ if SUPABASE_URL and SUPABASE_KEY and create_client:
     except:
         print("Supabase connection failed")
 
+# Online model (optional): learns from /feedback, see online_model.py
+# Enabled by setting ONLINE_MODEL_PATH; served by /predict once it has seen ONLINE_MIN_UPDATES examples
+# /feedback trains the served model, so it only accepts requests carrying FEEDBACK_TOKEN
+ONLINE_MODEL_PATH = os.getenv("ONLINE_MODEL_PATH")
+FEEDBACK_TOKEN = os.getenv("FEEDBACK_TOKEN")
+ONLINE_MIN_UPDATES = int(os.getenv("ONLINE_MIN_UPDATES", "500"))
+FEEDBACK_BATCH_SIZE = 32
+FEEDBACK_QUEUE_SIZE = 10000
+CHECKPOINT_EVERY = 1000
+online_model = None
+if ONLINE_MODEL_PATH and HashingModel:
+    try:
+        online_model = HashingModel.load(ONLINE_MODEL_PATH) if os.path.exists(ONLINE_MODEL_PATH) else HashingModel()
+    except Exception as e:
+        print(f"Online model load failed: {e}")
+# Created in startup_event, on the serving loop
+feedback_queue = None
+
 def get_model():
+    if online_model is not None and online_model.updates >= ONLINE_MIN_UPDATES:
+        return online_model
     return None
 
+# Load shedding for the model path (see admission.py)
+MODEL_MAX_IN_FLIGHT = int(os.getenv("MODEL_MAX_IN_FLIGHT", "8"))
+admission = AdmissionController(max_in_flight=MODEL_MAX_IN_FLIGHT) if AdmissionController else None
+
+async def feedback_trainer():
+    """
+    Background task: applies queued feedback to the online model in mini-batches and checkpoints it.
+    A None in the queue stops it once everything queued before it has been applied.
+    """
+    last_checkpoint = online_model.updates
+    stopping = False
+    while not stopping:
+        batch = []
+        item = await feedback_queue.get()
+        # Mini-batch: take whatever else is already waiting
+        while True:
+            if item is None:
+                stopping = True
+                break
+            batch.append(item)
+            if len(batch) >= FEEDBACK_BATCH_SIZE or feedback_queue.empty():
+                break
+            item = feedback_queue.get_nowait()
+        if not batch:
+            continue
+        try:
+            await run_in_threadpool(online_model.partial_fit, [t for t, _ in batch], [y for _, y in batch])
+            if not stopping and online_model.updates - last_checkpoint >= CHECKPOINT_EVERY:
+                await run_in_threadpool(online_model.save, ONLINE_MODEL_PATH)
+                last_checkpoint = online_model.updates
+        except Exception as e:
+            print(f"Feedback Training Error: {e}")
+
 @app.on_event("startup")
 async def startup_event():
     # Only print, do not perform heavy lifting here to avoid deployment timeouts
     print("Application starting up...")
+    global feedback_queue
+    if online_model is not None:
+        feedback_queue = asyncio.Queue(maxsize=FEEDBACK_QUEUE_SIZE)
+        app.state.feedback_trainer = asyncio.create_task(feedback_trainer())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if feedback_queue is not None:
+        # Let the trainer apply what is queued and finish any fit in progress, then checkpoint
+        await feedback_queue.put(None)
+        await app.state.feedback_trainer
+        try:
+            await run_in_threadpool(online_model.save, ONLINE_MODEL_PATH)
+        except Exception as e:
+            print(f"Online model checkpoint failed: {e}")
+
+def heuristic_verdict(analysis):
+    """
+    Score arithmetic used when the ML model is unavailable. Returns (label, confidence 0-1).
+    """
+    # Simple Heuristic Logic
+    score = 50
+    if analysis.get('sentiment') == 'Negative': score -= 20
+    if analysis.get('sentiment') == 'Positive': score += 10
+    
+    # Subjectivity penalty
+    if "Subjective" in analysis.get('objectivity', ''): score -= 15
+    
+    # Clickbait penalty
+    score -= (analysis.get('clickbait_score', 0) * 0.5)
+    
+    # Reading ease bonus (credible news is often standard/complex)
+    if "Standard" in analysis.get('complexity', '') or "Complex" in analysis.get('complexity', ''):
+        score += 15
+        
+    confidence = min(max(abs(score - 50) / 50, 0.60), 0.95) # Floor confidence at 60%
+    label = "REAL" if score > 45 else "FAKE"
+    return label, confidence
 
 class UrlRequest(BaseModel):
     url: str
 
+class FeedbackRequest(BaseModel):
+    text: str
+    label: str  # "FAKE" or "REAL"
+
 class TextRequest(BaseModel):
     text: str
+    # Optional latency budget: milliseconds from arrival, and/or an absolute unix-time deadline
+    latency_budget_ms: Optional[float] = Field(None, gt=0)
+    deadline: Optional[float] = None
 
-@app.post("/predict")
-async def predict(request: TextRequest):
+def heuristic_predict(text, status="success_heuristic"):
+    try:
+        analysis = TextAnalyzer.analyze(text)
+    except Exception as e:
+        print(f"Heuristic Analysis Failed: {e}")
+        # Minimal fallback if even heuristics fail
+        analysis = {
+            "sentiment": "Neutral",
+            "objectivity": "Unknown",
+            "complexity": "Standard",
+            "clickbait_score": 0,
+            "tone": "Neutral"
+        }
+    
+    label, confidence = heuristic_verdict(analysis)
+    
+    return {
+        "label": label,
+        "confidence": round(confidence * 100, 1),
+        "status": status,
+        "analysis": analysis
+    }
+
+def model_verdict(pipeline, text):
+    """
+    Blocking model call. Returns (label, confidence 0-1).
+    """
+    # Predict directly on raw text
+    prediction_cls = pipeline.predict([text])[0]
+    
+    # Get probability if available
+    try:
+        prediction_prob = pipeline.predict_proba([text])[0]
+        confidence = float(max(prediction_prob))
+    except:
+        confidence = 1.0
+        
+    label = "FAKE" if prediction_cls == 1 else "REAL"
+    return label, confidence
+
+def model_predict(pipeline, text):
+    """
+    Blocking model-path work, run in the threadpool. Returns (label, confidence 0-1, analysis).
+    """
+    label, confidence = model_verdict(pipeline, text)
+    
+    # Advanced Analysis
+    try:
+        analysis = TextAnalyzer.analyze(text)
+    except:
+         analysis = {}
+    return label, confidence, analysis
+
+def live_verdict(pipeline, document):
+    """
+    Blocking model call for /ws/live: scores the LiveDocument's cached hashed counts,
+    or the full text if the model does not use the document's feature space.
+    """
+    fake = document.model_proba(pipeline) if HashingModel is not None and isinstance(pipeline, HashingModel) else None
+    if fake is None:
+        return model_verdict(pipeline, document.text)
+    return ("FAKE" if fake >= 0.5 else "REAL"), max(fake, 1 - fake)
+
+def predict_batch(pipeline, texts):
+    """
+    Score a list of texts in one model call (heuristics per text when the model is unavailable).
+    """
+    if pipeline is None:
+        return [heuristic_predict(text) for text in texts]
+
+    predictions = pipeline.predict(texts)
+    try:
+        confidences = [float(max(p)) for p in pipeline.predict_proba(texts)]
+    except:
+        confidences = [1.0] * len(texts)
+
+    results = []
+    for text, prediction_cls, confidence in zip(texts, predictions, confidences):
+        try:
+            analysis = TextAnalyzer.analyze(text)
+        except:
+            analysis = {}
+        results.append({
+            "label": "FAKE" if prediction_cls == 1 else "REAL",
+            "confidence": round(confidence * 100, 1),
+            "status": "success",
+            "analysis": analysis
+        })
+    return results
+
+async def run_predict(request: TextRequest, pipeline):
     import traceback
     # 0. CHECK FOR STARTUP CRASHES
     if startup_error:
@@ -91,68 +315,38 @@ async def predict(request: TextRequest):
             "analysis": {"error": startup_error}
         }
 
+    budget = request_budget(request.latency_budget_ms, request.deadline) if admission else None
+
     try:
-        pipeline = get_model()
         if pipeline is None:
             # Fallback to Heuristic Analysis if ML model is unavailable
             if TextAnalyzer is None:
                  return {"label": "ERROR", "status": "failure_features_missing", "analysis": {"error": "TextAnalyzer failed to import"}}
                  
-            try:
-                analysis = TextAnalyzer.analyze(request.text)
-            except Exception as e:
-                print(f"Heuristic Analysis Failed: {e}")
-                # Minimal fallback if even heuristics fail
-                analysis = {
-                    "sentiment": "Neutral",
-                    "objectivity": "Unknown",
-                    "complexity": "Standard",
-                    "clickbait_score": 0,
-                    "tone": "Neutral"
+            return heuristic_predict(request.text)
+
+        # Admission control: degrade to heuristics (or reject) when the model path would blow the budget
+        decision = admission.decide(budget, can_degrade=TextAnalyzer is not None) if admission else "model"
+        if decision == "reject":
+            retry_after = admission.retry_after()
+            return JSONResponse(
+                status_code=503,
+                headers={"Retry-After": str(retry_after)},
+                content={
+                    "label": "ERROR",
+                    "status": "failure_overloaded",
+                    "retry_after": retry_after,
+                    "analysis": {"error": "Server is busy and the request deadline cannot be met"}
                 }
-            
-            # Simple Heuristic Logic
-            score = 50
-            if analysis.get('sentiment') == 'Negative': score -= 20
-            if analysis.get('sentiment') == 'Positive': score += 10
-            
-            # Subjectivity penalty
-            if "Subjective" in analysis.get('objectivity', ''): score -= 15
-            
-            # Clickbait penalty
-            score -= (analysis.get('clickbait_score', 0) * 0.5)
-            
-            # Reading ease bonus (credible news is often standard/complex)
-            if "Standard" in analysis.get('complexity', '') or "Complex" in analysis.get('complexity', ''):
-                score += 15
-                
-            confidence = min(max(abs(score - 50) / 50, 0.60), 0.95) # Floor confidence at 60%
-            label = "REAL" if score > 45 else "FAKE"
-            
-            return {
-                "label": label,
-                "confidence": round(confidence * 100, 1),
-                "status": "success_heuristic",
-                "analysis": analysis
-            }
-        
-        # Predict directly on raw text
-        prediction_cls = pipeline.predict([request.text])[0]
-        
-        # Get probability if available
-        try:
-            prediction_prob = pipeline.predict_proba([request.text])[0]
-            confidence = float(max(prediction_prob))
-        except:
-            confidence = 1.0
-            
-        label = "FAKE" if prediction_cls == 1 else "REAL"
-        
-        # Advanced Analysis
-        try:
-            analysis = TextAnalyzer.analyze(request.text)
-        except:
-             analysis = {}
+            )
+        if decision == "degrade":
+            return heuristic_predict(request.text, status="success_degraded")
+
+        if admission:
+            with admission.track():
+                label, confidence, analysis = await run_in_threadpool(admission.timed, model_predict, pipeline, request.text)
+        else:
+            label, confidence, analysis = await run_in_threadpool(model_predict, pipeline, request.text)
         
         # Log to Supabase
         if supabase:
@@ -177,13 +371,180 @@ async def predict(request: TextRequest):
         print(f"Prediction Error: {trace}")
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)} | Trace: {trace}")
 
-@app.post("/scan-url")
-async def scan_url(request: UrlRequest):
+def model_version(pipeline):
+    """
+    Identifies what produced a result; part of the response ETag.
+    Read it before scoring: the trainer may update the model meanwhile, and a tag naming the newer
+    weights must never be handed out for a result of the older ones.
+    """
+    if pipeline is None:
+        return "heuristic"
+    return f"{type(pipeline).__name__}-{getattr(pipeline, 'updates', 0)}"
+
+def result_etag(result, text, fields=None, version=None):
+    """
+    Input-derived ETag for a /predict result, or None for failures.
+    `version` is model_version() of the model that scored it, read before scoring.
+    Degraded answers get their own version so they never revalidate as model results.
+    """
+    status = result.get("status")
+    if status == "success_heuristic":
+        version = "heuristic"
+    elif status == "success_degraded":
+        version = "degraded"
+    elif status != "success" or version is None:
+        return None
+    return input_etag(version, text, fields)
+
+def result_response(http_request, result, text, fields=None, version=None):
+    # Already a finished response (e.g. load shedding's 503)
+    if isinstance(result, Response):
+        return result
+    if json_response is None:
+        return result
+    if fields:
+        result = trim_analysis(result, fields)
+    return json_response(http_request, result, etag=result_etag(result, text, fields, version))
+
+@app.post("/predict")
+async def predict(request: TextRequest, http_request: Request, fields: Optional[str] = None):
+    """
+    `fields` (comma-separated) keeps only those keys of `analysis`, e.g. ?fields=sentiment,tone
+    """
+    pipeline = get_model()
+    version = model_version(pipeline)
+    return result_response(http_request, await run_predict(request, pipeline), request.text, fields, version)
+
+@app.get("/predict")
+async def predict_get(http_request: Request, text: str, fields: Optional[str] = None,
+                      latency_budget_ms: Optional[float] = Query(None, gt=0), deadline: Optional[float] = None):
+    """
+    GET variant of /predict so clients can revalidate cached results with If-None-Match.
+    The validator is derived from the inputs, so a match returns 304 without scoring.
+    Keep texts short: most proxies and servers cap the request line around 8 KB.
+    """
+    pipeline = get_model()
+    version = model_version(pipeline)
+    if json_response is not None and not startup_error:
+        response = not_modified(http_request, input_etag(version, text, fields))
+        if response is not None:
+            return response
+
+    request = TextRequest(text=text, latency_budget_ms=latency_budget_ms, deadline=deadline)
+    return result_response(http_request, await run_predict(request, pipeline), text, fields, version)
+
+# --- Streaming Bulk Scoring ---
+# Records are scored this many at a time; also bounds how much of the upload is held in memory
+STREAM_CHUNK_SIZE = 64
+
+class UploadStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body iterator reads the request body itself.
+    Starlette's disconnect listener would compete for receive() and swallow upload chunks,
+    so only stream; a disconnect surfaces from the request stream or a failed send instead.
+    """
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+
+def score_chunk(pipeline, records):
+    """
+    Score a chunk of (record_id, text, error) tuples and render them as NDJSON bytes.
+    """
+    valid = [(record_id, text) for record_id, text, error in records if error is None]
+    try:
+        scored = iter(predict_batch(pipeline, [text for _, text in valid]))
+    except Exception as e:
+        print(f"Stream Scoring Error: {e}")
+        scored = iter([{"label": "ERROR", "status": "failure_scoring", "analysis": {"error": str(e)}}] * len(valid))
+
+    lines = []
+    for record_id, text, error in records:
+        if error is None:
+            result = {"id": record_id, **next(scored)}
+        else:
+            result = {"id": record_id, "label": "ERROR", "status": "failure_record", "analysis": {"error": error}}
+        lines.append(json.dumps(result, separators=(',', ':')))
+    return ("\n".join(lines) + "\n").encode()
+
+@app.post("/predict/stream")
+async def predict_stream(request: Request, format: Optional[str] = None):
+    """
+    Bulk scoring for NDJSON ({"id": ..., "text": ...} per line) or CSV (header with a 'text' column) uploads.
+    Results stream back as NDJSON, one line per record in upload order, while the upload is still arriving.
+    The body is only read as fast as results are consumed, so slow readers apply backpressure.
+    """
+    if startup_error:
+        return {
+            "label": "ERROR",
+            "confidence": 0.0,
+            "status": "failure_startup",
+            "analysis": {"error": startup_error}
+        }
+
+    if iter_records is None:
+        raise HTTPException(status_code=503, detail="Streaming upload support failed to import")
+
+    fmt = format or ("csv" if "csv" in request.headers.get("content-type", "") else "ndjson")
+    if fmt not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail=f"Unsupported format '{fmt}' (use 'ndjson' or 'csv')")
+
+    pipeline = get_model()
+
+    async def score(chunk):
+        if admission is None or pipeline is None:
+            return await run_in_threadpool(score_chunk, pipeline, chunk)
+        # Counts as in-flight model work so /predict sheds load while a bulk upload runs.
+        # Not timed: a chunk's service time is not that of a single request.
+        with admission.track():
+            return await run_in_threadpool(score_chunk, pipeline, chunk)
+
+    async def results():
+        chunk = []
+        async for record in iter_records(request.stream(), fmt):
+            chunk.append(record)
+            if len(chunk) >= STREAM_CHUNK_SIZE:
+                yield await score(chunk)
+                chunk = []
+        if chunk:
+            yield await score(chunk)
+
+    return UploadStreamingResponse(results(), media_type="application/x-ndjson")
+
+@app.post("/feedback")
+async def feedback(request: FeedbackRequest, authorization: Optional[str] = Header(None)):
+    """
+    Queue a labeled correction for the online model. Requires `Authorization: Bearer <FEEDBACK_TOKEN>`.
+    """
+    if online_model is None or feedback_queue is None or not FEEDBACK_TOKEN:
+        raise HTTPException(status_code=404, detail="Online learning is disabled (set ONLINE_MODEL_PATH and FEEDBACK_TOKEN)")
+
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.strip().encode(), FEEDBACK_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid or missing feedback token", headers={"WWW-Authenticate": "Bearer"})
+
+    label = request.label.strip().upper()
+    if label not in ("FAKE", "REAL"):
+        raise HTTPException(status_code=400, detail="label must be 'FAKE' or 'REAL'")
+
+    try:
+        feedback_queue.put_nowait((request.text, 1 if label == "FAKE" else 0))
+    except asyncio.QueueFull:
+        return JSONResponse(
+            status_code=503,
+            headers={"Retry-After": "5"},
+            content={"status": "failure_queue_full", "pending": feedback_queue.qsize()}
+        )
+    return {"status": "queued", "pending": feedback_queue.qsize(), "updates": online_model.updates}
+
+def fetch_article(url):
     try:
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        response = requests.get(request.url, headers=headers, timeout=10)
+        response = requests.get(url, headers=headers, timeout=10)
         response.raise_for_status()
         
         soup = BeautifulSoup(response.content, 'html.parser')
@@ -210,6 +571,121 @@ async def scan_url(request: UrlRequest):
         print(f"URL Scan Error: {e}")
         raise HTTPException(status_code=400, detail=f"Failed to fetch URL: {str(e)}")
 
+@app.post("/scan-url")
+async def scan_url(request: UrlRequest, http_request: Request):
+    article = fetch_article(request.url)
+    return json_response(http_request, article, "scan") if json_response else article
+
+@app.get("/scan-url")
+async def scan_url_get(http_request: Request, url: str):
+    article = fetch_article(url)
+    return json_response(http_request, article, "scan") if json_response else article
+
+# --- Live Analysis (WebSocket) ---
+# Wait this long after the last message before analysing, so a burst of keystrokes costs one result
+LIVE_DEBOUNCE_SECONDS = 0.15
+# ...but never hold results back longer than this while the user keeps typing
+LIVE_MAX_DELAY_SECONDS = 1.0
+
+@app.websocket("/ws/live")
+async def live_analysis(websocket: WebSocket):
+    """
+    Incremental analysis for the Live Editor.
+    Client messages: {"version": n, "text": "..."} to (re)load the document, or
+    {"version": n, "edits": [{"start": i, "end": j, "text": "..."}]} with code point offsets.
+    Each coalesced batch of messages gets one reply carrying the latest version.
+    """
+    await websocket.accept()
+    if startup_error or LiveDocument is None:
+        await websocket.send_json({"label": "ERROR", "status": "failure_startup", "analysis": {"error": startup_error or "Live analysis unavailable"}})
+        await websocket.close()
+        return
+
+    document = LiveDocument()
+    messages = asyncio.Queue()
+
+    async def reader():
+        try:
+            while True:
+                messages.put_nowait(await websocket.receive_json())
+        except WebSocketDisconnect:
+            pass
+        except Exception as e:
+            print(f"Live Analysis Read Error: {e}")
+        messages.put_nowait(None)
+
+    reader_task = asyncio.create_task(reader())
+    loop = asyncio.get_running_loop()
+    error = None
+    try:
+        while True:
+            message = await messages.get()
+            if message is None:
+                break
+
+            # Debounce & coalesce: apply everything that arrives while the user is typing
+            deadline = loop.time() + LIVE_MAX_DELAY_SECONDS
+            version = None
+            closed = False
+            while True:
+                try:
+                    version = message.get("version", version)
+                    if "text" in message:
+                        document.reset(str(message["text"]))
+                        error = None
+                    elif error is None:
+                        document.apply(message.get("edits", []))
+                except (AttributeError, KeyError, TypeError, ValueError) as e:
+                    # Server and client documents may now differ; ignore edits until the full text is resent
+                    error = f"Invalid live update: {e}"
+
+                timeout = min(LIVE_DEBOUNCE_SECONDS, deadline - loop.time())
+                if timeout <= 0:
+                    break
+                try:
+                    message = await asyncio.wait_for(messages.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if message is None:
+                    closed = True
+                    break
+            if closed:
+                break
+
+            if error:
+                await websocket.send_json({"version": version, "label": "ERROR", "status": "failure_out_of_sync", "analysis": {"error": error}})
+                continue
+
+            analysis = document.analysis()
+            pipeline = get_model()
+            decision = admission.decide() if admission and pipeline is not None else "model"
+            if pipeline is None:
+                label, confidence = heuristic_verdict(analysis)
+                status = "success_heuristic"
+            elif decision != "model":
+                label, confidence = heuristic_verdict(analysis)
+                status = "success_degraded"
+            elif admission:
+                # Same verdict as /predict, from the per-block hashed counts (not timed: it costs
+                # about one edit, not one request)
+                with admission.track():
+                    label, confidence = await run_in_threadpool(live_verdict, pipeline, document)
+                status = "success"
+            else:
+                label, confidence = await run_in_threadpool(live_verdict, pipeline, document)
+                status = "success"
+            await websocket.send_json({
+                "version": version,
+                "label": label,
+                "confidence": round(confidence * 100, 1),
+                "status": status,
+                "analysis": analysis
+            })
+    except WebSocketDisconnect:
+        pass
+    finally:
+        reader_task.cancel()
+
 @app.get("/")
 def read_root():
     return {"message": "Fake News Detector API (Advanced features) is running"}
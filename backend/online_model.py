@@ -0,0 +1,137 @@
+import json
+import math
+import os
+import zlib
+from array import array
+
+from features import LABEL_LEAK_WORDS, clean_text
+
+# --- Online Model (Pure Python) ---
+#
+# Logistic regression over a fixed-size hashed feature space, trained with SGD one example
+# at a time. There is no vocabulary: a token's column is crc32(token) mod N_FEATURES, so the
+# model is a flat array of weights and can keep learning from feedback without a refit.
+
+N_FEATURES = 2 ** 20
+
+
+def tokenize(text):
+    """
+    Words the model sees: cleaned tokens without the dataset's label-leaking words.
+    """
+    return [w for w in clean_text(text).split() if w not in LABEL_LEAK_WORDS]
+
+
+def hash_token(token, n_features=N_FEATURES):
+    """
+    (column, sign) of a unigram or "a b" bigram.
+    """
+    h = zlib.crc32(token.encode())
+    # A second hash bit picks the sign so collisions tend to cancel out
+    return h % n_features, (-1.0 if h & 0x80000000 else 1.0)
+
+
+def term_weight(count):
+    """
+    Sublinear tf of a signed hashed count.
+    """
+    return math.copysign(1 + math.log(abs(count)), count) if count else 0.0
+
+
+def sigmoid(z):
+    if z < -35: return 0.0
+    if z > 35: return 1.0
+    return 1 / (1 + math.exp(-z))
+
+
+class HashingModel:
+    """
+    Incremental FAKE (1) / REAL (0) classifier.
+    Exposes predict / predict_proba on raw texts, like the offline pipeline used by /predict.
+    """
+
+    def __init__(self, n_features=N_FEATURES, learning_rate=0.5, alpha=1e-6, decay=1e-4):
+        self.n_features = n_features
+        self.learning_rate = learning_rate
+        self.alpha = alpha  # L2 penalty, applied to the weights an example touches
+        self.decay = decay  # learning rate decays as 1 / (1 + decay * updates)
+        self.weights = array('d', bytes(8 * n_features))
+        self.bias = 0.0
+        self.updates = 0
+
+    def features(self, text):
+        """
+        Sparse {column: value} vector: signed hashed unigrams + bigrams, sublinear tf, L2-normalised.
+        """
+        words = tokenize(text)
+        tokens = words + [a + " " + b for a, b in zip(words, words[1:])]
+
+        counts = {}
+        for token in tokens:
+            column, sign = hash_token(token, self.n_features)
+            counts[column] = counts.get(column, 0.0) + sign
+
+        vector = {}
+        for column, count in counts.items():
+            if count:
+                vector[column] = term_weight(count)
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        return {column: v / norm for column, v in vector.items()}
+
+    def _probability(self, vector):
+        weights = self.weights
+        return sigmoid(self.bias + sum(weights[column] * v for column, v in vector.items()))
+
+    def partial_fit(self, texts, labels):
+        """
+        One SGD step per (text, label) pair, in order.
+        """
+        weights = self.weights
+        for text, label in zip(texts, labels):
+            vector = self.features(text)
+            eta = self.learning_rate / (1 + self.decay * self.updates)
+            gradient = self._probability(vector) - label
+            for column, v in vector.items():
+                weights[column] -= eta * (gradient * v + self.alpha * weights[column])
+            self.bias -= eta * gradient
+            self.updates += 1
+        return self
+
+    def predict_proba(self, texts):
+        probabilities = []
+        for text in texts:
+            fake = self._probability(self.features(text))
+            probabilities.append([1 - fake, fake])
+        return probabilities
+
+    def predict(self, texts):
+        return [1 if fake >= 0.5 else 0 for _, fake in self.predict_proba(texts)]
+
+    def save(self, path):
+        """
+        Checkpoint to path atomically (header line + raw weights).
+        """
+        header = {
+            "n_features": self.n_features,
+            "learning_rate": self.learning_rate,
+            "alpha": self.alpha,
+            "decay": self.decay,
+            "bias": self.bias,
+            "updates": self.updates,
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(json.dumps(header).encode() + b"\n")
+            self.weights.tofile(f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            header = json.loads(f.readline())
+            model = cls(header["n_features"], header["learning_rate"], header["alpha"], header["decay"])
+            model.weights = array('d')
+            model.weights.fromfile(f, header["n_features"])
+        model.bias = header["bias"]
+        model.updates = header["updates"]
+        return model
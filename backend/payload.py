@@ -0,0 +1,147 @@
+import gzip
+import hashlib
+import json
+
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# --- Response Payloads: ETags, Conditional GET, Compression ---
+#
+# API results are serialised once, tagged with a strong ETag and compressed when large enough.
+# Scoring is deterministic, so /predict derives its ETag from the inputs (text, fields, model
+# version) and can answer a matching If-None-Match with an empty 304 before scoring anything.
+# Other payloads (e.g. /scan-url) are tagged from the serialised body.
+
+COMPRESS_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4  # Fast setting meant for dynamic content
+
+# Compressed representations get their own strong ETag (as required for byte-identical validators)
+ENCODING_SUFFIXES = {"br": "-br", "gzip": "-gz"}
+
+
+def trim_analysis(result, fields):
+    """
+    Keep only the requested `analysis` keys (comma-separated string or list).
+    Failure payloads are returned untouched so their `analysis.error` is never dropped.
+    """
+    if not str(result.get("status", "")).startswith("success"):
+        return result
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    wanted = {f.strip() for f in fields if f.strip()}
+    analysis = result.get("analysis")
+    if not wanted or not isinstance(analysis, dict):
+        return result
+    return {**result, "analysis": {k: v for k, v in analysis.items() if k in wanted}}
+
+
+def normalize_fields(fields):
+    if not fields:
+        return ""
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    return ",".join(sorted({f.strip() for f in fields if f.strip()}))
+
+
+def make_etag(body, version):
+    return '"' + hashlib.sha256(version.encode() + b"\0" + body).hexdigest()[:32] + '"'
+
+
+def input_etag(version, text, fields=None):
+    """
+    ETag of a /predict result, known before scoring: same inputs + same model = same bytes.
+    """
+    return make_etag(text.encode() + b"\0" + normalize_fields(fields).encode(), version)
+
+
+def etag_matches(if_none_match, etag):
+    """
+    The If-None-Match entry matching etag (in any of its encodings), or None.
+    """
+    if not if_none_match:
+        return None
+    for entry in if_none_match.split(","):
+        entry = entry.strip()
+        if entry == "*":
+            return etag
+        candidate = entry[2:] if entry.startswith("W/") else entry
+        # Accept the tag of any encoding of the same content
+        for suffix in ENCODING_SUFFIXES.values():
+            if candidate.endswith(suffix + '"'):
+                candidate = candidate[:-len(suffix) - 1] + '"'
+                break
+        if candidate == etag:
+            return entry
+    return None
+
+
+def not_modified(request, etag):
+    """
+    An empty 304 if request is a GET/HEAD whose If-None-Match matches etag, else None.
+    """
+    if request.method not in ("GET", "HEAD"):
+        return None
+    matched = etag_matches(request.headers.get("if-none-match"), etag)
+    if matched is None:
+        return None
+    # Echo the validator the client holds (it names the encoding it cached)
+    return Response(status_code=304, headers={
+        "ETag": matched, "Cache-Control": "private, no-cache", "Vary": "Accept-Encoding",
+    })
+
+
+def choose_encoding(accept_encoding):
+    """
+    Preferred content coding from an Accept-Encoding header: 'br', 'gzip' or None.
+    """
+    accepted = set()
+    for item in (accept_encoding or "").split(","):
+        name, _, params = item.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip().lower())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def json_response(request, payload, version=None, etag=None, status_code=200):
+    """
+    Serialise payload once and return it compressed, with ETag / 304 handling.
+    The ETag is `etag` if given, else derived from the body and `version`; with neither, none is sent.
+    """
+    body = json.dumps(payload, separators=(',', ':'), sort_keys=True).encode()
+    if etag is None and version is not None:
+        etag = make_etag(body, version)
+
+    if etag and status_code == 200:
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+
+    encoding = choose_encoding(request.headers.get("accept-encoding")) if len(body) >= COMPRESS_MIN_SIZE else None
+    headers = {"Vary": "Accept-Encoding"}
+    if etag:
+        headers["ETag"] = etag[:-1] + ENCODING_SUFFIXES[encoding] + '"' if encoding else etag
+        headers["Cache-Control"] = "private, no-cache"
+
+    if encoding == "br":
+        body = brotli.compress(body, quality=BROTLI_QUALITY)
+    elif encoding == "gzip":
+        body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
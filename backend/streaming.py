@@ -0,0 +1,155 @@
+import csv
+import json
+
+# --- Incremental Parsing for Streamed Uploads ---
+#
+# Records are parsed as the request body arrives, so memory is bounded by the largest
+# single record (MAX_RECORD_BYTES) plus one scoring chunk, whatever the upload size.
+
+MAX_RECORD_BYTES = 1_000_000
+BOM = '\ufeff'
+
+csv.field_size_limit(MAX_RECORD_BYTES)
+
+
+async def iter_lines(chunks, max_line_bytes=MAX_RECORD_BYTES):
+    """
+    Split an async stream of byte chunks into lines (without the line ending).
+    Lines longer than max_line_bytes are skipped and yielded as None.
+    """
+    buffer = bytearray()
+    skipping = False
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        buffer += chunk
+        start = 0
+        while True:
+            newline = buffer.find(b'\n', start)
+            if newline < 0:
+                break
+            if skipping:
+                skipping = False
+            else:
+                yield bytes(buffer[start:newline]).rstrip(b'\r')
+            start = newline + 1
+        del buffer[:start]
+
+        if len(buffer) > max_line_bytes:
+            if not skipping:
+                yield None
+            skipping = True
+            buffer.clear()
+
+    if buffer and not skipping:
+        yield bytes(buffer).rstrip(b'\r')
+
+
+def _ends_quoted(line, quoted):
+    """
+    Whether a CSV line ends inside a quoted field, given whether it started inside one.
+    As in the csv module, a field is quoted only if it starts with '"'; a quote anywhere else
+    is a literal character, and inside a quoted field '""' is an escaped quote.
+    """
+    pos = 0
+    while True:
+        if quoted:
+            close = line.find('"', pos)
+            if close < 0:
+                return True
+            if line.startswith('"', close + 1):
+                pos = close + 2
+                continue
+            quoted = False
+            pos = close + 1
+        elif line.startswith('"', pos):
+            quoted = True
+            pos += 1
+            continue
+        # Skip the rest of an unquoted field (or what follows a closing quote) to the next field
+        comma = line.find(',', pos)
+        if comma < 0:
+            return False
+        pos = comma + 1
+
+
+async def iter_records(chunks, fmt="ndjson"):
+    """
+    Yield (record_id, text, error) for every record of an NDJSON or CSV upload.
+    NDJSON lines are objects with "text" (and optional "id"); CSV needs a header with a "text" column.
+    Records without an id get their 1-based record number.
+    """
+    number = 0
+    if fmt == "ndjson":
+        first = True
+        async for line in iter_lines(chunks):
+            if first and line is not None:
+                line = line.removeprefix(BOM.encode())
+                first = False
+            if line is not None and not line.strip():
+                continue
+            number += 1
+            if line is None:
+                yield number, None, f"Record exceeds {MAX_RECORD_BYTES} bytes"
+                continue
+            try:
+                record = json.loads(line)
+                text = record["text"]
+                if not isinstance(text, str):
+                    raise TypeError("'text' must be a string")
+            except (ValueError, KeyError, TypeError) as e:
+                yield number, None, f"Invalid record: {e}"
+                continue
+            yield record.get("id", number), text, None
+        return
+
+    # CSV: a record may span several lines inside a quoted field; see _ends_quoted
+    columns = None
+    pending = []
+    pending_size = 0
+    quoted = False
+    first = True
+    async for line in iter_lines(chunks):
+        if line is None or pending_size + len(line) > MAX_RECORD_BYTES:
+            pending, pending_size, quoted = [], 0, False
+            if columns is not None:
+                number += 1
+                yield number, None, f"Record exceeds {MAX_RECORD_BYTES} bytes"
+            continue
+
+        text = line.decode('utf-8', errors='replace')
+        if first:
+            text = text.lstrip(BOM)
+            first = False
+        pending.append(text)
+        pending_size += len(line)
+        quoted = _ends_quoted(text, quoted)
+        if quoted:
+            continue
+        row = next(csv.reader(["\n".join(pending)]), [])
+        pending, pending_size = [], 0
+        if not row:
+            continue
+
+        if columns is None:
+            columns = [name.strip().lower() for name in row]
+            if "text" not in columns:
+                yield None, None, "CSV header must contain a 'text' column"
+                return
+            text_column = columns.index("text")
+            id_column = columns.index("id") if "id" in columns else None
+            continue
+
+        number += 1
+        if text_column >= len(row):
+            yield number, None, "Invalid record: missing 'text' field"
+            continue
+        record_id = row[id_column] if id_column is not None and id_column < len(row) else number
+        yield record_id, row[text_column], None
+
+    if pending:
+        if columns is None:
+            yield None, None, "CSV header has an unterminated quoted field"
+        else:
+            number += 1
+            yield number, None, "Invalid record: unterminated quoted field at end of upload"
@@ -11,6 +11,8 @@ from sklearn.calibration import CalibratedClassifierCV
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score
 
+from features import LABEL_LEAK_WORDS
+
 # Download NLTK resources
 nltk.download('stopwords')
 nltk.download('wordnet')
@@ -26,16 +28,8 @@ def clean_text(text):
     # Remove stopwords and lemmatize
     stop_words = set(stopwords.words('english'))
     # Specific to this dataset: Remove common bias words that might lead to overfitting
-    # - "reuters", "said", "reporting": Reuters specific style
-    # - "mr": Found as top indicator for Fake news (likely due to style guide diffs)
-    # - "washington": Top indicator for Real news
-    # - DAYS: Real news (Reuters) mentions days often at start
-    words_to_remove = [
-        'reuters', 'said', 'reporting', 'via', 'image', 'mr', 'washington', 
-        'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday',
-        'january', 'february', 'march', 'april', 'may', 'june', 'july', 'august', 'september', 'october', 'november', 'december',
-        'best'
-    ]
+    # (shared with the online model, see features.LABEL_LEAK_WORDS)
+    words_to_remove = LABEL_LEAK_WORDS
     
     text = " ".join([lemmatizer.lemmatize(word) for word in text.split() if word not in stop_words and word not in words_to_remove])
     
@@ -71,12 +65,7 @@ def train_and_save():
     print("Vectorizing...")
     # Define stop words list again to force exclusion in Vectorizer
     # This guarantees 'best' and others are not in vocab even if preprocessing misses them
-    forced_stop_words = [
-        'reuters', 'said', 'reporting', 'via', 'image', 'mr', 'washington', 
-        'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday',
-        'january', 'february', 'march', 'april', 'may', 'june', 'july', 'august', 'september', 'october', 'november', 'december',
-        'best', 'pm', 'am', 'night'
-    ]
+    forced_stop_words = sorted(LABEL_LEAK_WORDS)
     # We also add standard english stop words to be safe
     forced_stop_words.extend(list(stopwords.words('english')))
     
@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import accuracy_score
+
+from online_model import HashingModel
+
+# Seeds the online model (see main.py /feedback) from Fake.csv/True.csv and benchmarks it:
+# update throughput, memory, and accuracy against the offline model.pkl/tfidf.pkl.
+# Usage: python train_model_online.py [output path, default online_model.bin]
+
+BATCH_SIZE = 32
+
+def offline_accuracy(x_test, y_test):
+    try:
+        import joblib
+        from train_model_basic import clean_text as basic_clean_text
+        model = joblib.load('model.pkl')
+        tfidf = joblib.load('tfidf.pkl')
+    except Exception as e:
+        print(f"Offline model unavailable, skipping comparison: {e}")
+        return None, None
+
+    start = time.perf_counter()
+    y_pred = model.predict(tfidf.transform([basic_clean_text(t) for t in x_test]))
+    elapsed = time.perf_counter() - start
+    print(f"Offline vocabulary: {len(tfidf.vocabulary_)} terms, tfidf.pkl {os.path.getsize('tfidf.pkl') / 1e6:.1f} MB")
+    return accuracy_score(y_test, y_pred), elapsed
+
+def train_and_save(path="online_model.bin"):
+    print("Loading data...")
+    try:
+        fake = pd.read_csv("Fake.csv")
+        true = pd.read_csv("True.csv")
+    except FileNotFoundError:
+        print("Error: Fake.csv or True.csv not found. Please ensure they are in the 'backend' folder.")
+        return
+
+    fake['label'] = 1
+    true['label'] = 0
+    df = pd.concat([fake, true], axis=0)
+    df = df.sample(frac=1, random_state=42).reset_index(drop=True)
+
+    # Same split as train_model_basic.py so accuracies are comparable
+    x_train, x_test, y_train, y_test = train_test_split(df['text'], df['label'], test_size=0.2, random_state=42)
+    x_train, y_train = list(x_train), list(y_train)
+    x_test, y_test = list(x_test), list(y_test)
+
+    print("Training online model (partial_fit)...")
+    model = HashingModel()
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i in range(0, len(x_train), BATCH_SIZE):
+        model.partial_fit(x_train[i:i + BATCH_SIZE], y_train[i:i + BATCH_SIZE])
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"Updates: {len(x_train)} docs in {elapsed:.1f}s = {len(x_train) / elapsed:.0f} docs/s")
+    print(f"Memory: weights {model.weights.itemsize * len(model.weights) / 1e6:.1f} MB (fixed), "
+          f"training peak {peak / 1e6:.1f} MB, no vocabulary")
+
+    start = time.perf_counter()
+    y_pred = model.predict(x_test)
+    online_elapsed = time.perf_counter() - start
+    print(f"Online Acc: {accuracy_score(y_test, y_pred):.4f} ({online_elapsed / len(x_test) * 1000:.2f} ms/doc)")
+
+    offline_acc, offline_elapsed = offline_accuracy(x_test, y_test)
+    if offline_acc is not None:
+        print(f"Offline Acc: {offline_acc:.4f} ({offline_elapsed / len(x_test) * 1000:.2f} ms/doc)")
+
+    print("Saving checkpoint...")
+    model.save(path)
+    print("Done.")
+
+if __name__ == "__main__":
+    train_and_save(*sys.argv[1:2])
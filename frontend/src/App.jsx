@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useCallback } from 'react'
 import { AlertCircle } from 'lucide-react'
 import Header from './components/Header'
 import NewsInput from './components/NewsInput'
@@ -107,6 +107,11 @@ function App() {
     }
   }
 
+  // Results pushed by the Live Editor socket (not added to history: they arrive on every pause in typing)
+  const handleLiveResult = useCallback((data) => {
+    if (data.label !== 'ERROR') setResult(data)
+  }, [])
+
   // Expanded list of diverse sample texts
   const sampleTexts = [
     "Breaking: Secret alien city discovered under Times Square! Government confirms contact with extraterrestrials in shocking press conference.", // Fake (Sensational/Clickbait)
@@ -173,6 +178,7 @@ function App() {
             <LiveEditor
               initialText={text}
               result={result}
+              onLiveResult={handleLiveResult}
               onAnalyze={(newText) => {
                 setText(newText);
                 return handlePredict(newText);
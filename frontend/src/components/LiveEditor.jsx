@@ -1,13 +1,83 @@
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import { RefreshCw, Wand2, Check } from 'lucide-react';
 import debounce from 'lodash.debounce';
 
-const LiveEditor = ({ initialText, onAnalyze, result }) => {
+// Smallest single replacement turning oldText into newText, in code point offsets (what the backend indexes by)
+const diffEdit = (oldText, newText) => {
+    let start = 0;
+    const maxStart = Math.min(oldText.length, newText.length);
+    while (start < maxStart && oldText[start] === newText[start]) start++;
+    let oldEnd = oldText.length;
+    let newEnd = newText.length;
+    while (oldEnd > start && newEnd > start && oldText[oldEnd - 1] === newText[newEnd - 1]) {
+        oldEnd--;
+        newEnd--;
+    }
+    // Never split a surrogate pair
+    if (start > 0 && /[\uD800-\uDBFF]/.test(oldText[start - 1])) start--;
+    if (oldEnd < oldText.length && /[\uDC00-\uDFFF]/.test(oldText[oldEnd])) { oldEnd++; newEnd++; }
+
+    const codePoints = (s) => Array.from(s).length;
+    const cpStart = codePoints(oldText.slice(0, start));
+    return {
+        start: cpStart,
+        end: cpStart + codePoints(oldText.slice(start, oldEnd)),
+        text: newText.slice(start, newEnd),
+    };
+};
+
+const LiveEditor = ({ initialText, onAnalyze, onLiveResult, result }) => {
     const [text, setText] = useState(initialText);
     const [autoAnalyze, setAutoAnalyze] = useState(true);
     const [isAnalyzing, setIsAnalyzing] = useState(false);
 
-    // Debounced analysis function
+    // Live socket: sends only the edited range, the server debounces and re-scores incrementally
+    const socketRef = useRef(null);
+    const sentTextRef = useRef(null);
+    const versionRef = useRef(0);
+    const textRef = useRef(text);
+    textRef.current = text;
+
+    useEffect(() => {
+        if (!onLiveResult || typeof WebSocket === 'undefined') return;
+        const protocol = window.location.protocol === 'https:' ? 'wss' : 'ws';
+        const socket = new WebSocket(`${protocol}://${window.location.host}/ws/live`);
+        socket.onmessage = (event) => {
+            const data = JSON.parse(event.data);
+            if (data.status === 'failure_out_of_sync') {
+                // Resync right away with the full current text
+                const current = textRef.current;
+                socket.send(JSON.stringify({ version: ++versionRef.current, text: current }));
+                sentTextRef.current = current;
+                setIsAnalyzing(false);
+                return;
+            }
+            if (data.version === versionRef.current) setIsAnalyzing(false);
+            onLiveResult(data);
+        };
+        socket.onclose = () => {
+            socketRef.current = null;
+            sentTextRef.current = null;
+        };
+        socketRef.current = socket;
+        return () => socket.close();
+    }, [onLiveResult]);
+
+    const sendLive = (newText) => {
+        const socket = socketRef.current;
+        if (!socket || socket.readyState !== WebSocket.OPEN) return false;
+        const version = ++versionRef.current;
+        if (sentTextRef.current === null) {
+            socket.send(JSON.stringify({ version, text: newText }));
+        } else {
+            socket.send(JSON.stringify({ version, edits: [diffEdit(sentTextRef.current, newText)] }));
+        }
+        sentTextRef.current = newText;
+        setIsAnalyzing(true);
+        return true;
+    };
+
+    // Debounced analysis function (fallback when the live socket is unavailable)
     const debouncedAnalyze = useCallback(
         debounce((newText) => {
             if (newText.trim()) {
@@ -20,6 +90,7 @@ const LiveEditor = ({ initialText, onAnalyze, result }) => {
 
     useEffect(() => {
         if (autoAnalyze && text !== initialText) {
+            if (text.trim() && sendLive(text)) return;
             debouncedAnalyze(text);
         }
         return () => debouncedAnalyze.cancel();
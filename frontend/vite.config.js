@@ -8,6 +8,7 @@ export default defineConfig({
     proxy: {
       '/predict': 'http://127.0.0.1:8000',
       '/scan-url': 'http://127.0.0.1:8000',
+      '/ws': { target: 'ws://127.0.0.1:8000', ws: true },
     }
   }
 })